@@ -0,0 +1,48 @@
+# request_cache_test.py
+from serial_comm import SerialComm
+import threading
+import time
+
+def main():
+    # 替换为您的串口名称，cache_max_age 为缓存有效期（秒）
+    serial_comm = SerialComm('COM10', cache_max_age=0.1)  # Windows示例
+    # serial_comm = SerialComm('/dev/ttyUSB0', cache_max_age=0.1)  # Linux示例
+
+    try:
+        print("\n===== 请求缓存测试 =====")
+
+        # 多个线程同时请求陀螺仪数据，只会发出一次串口请求
+        print("\n1. 并发请求陀螺仪数据")
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(serial_comm.request_gyro()))
+                   for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        print(f"收到 {len(results)} 个结果: {results}")
+
+        # 有效期内再次请求直接返回缓存
+        print("\n2. 有效期内再次请求")
+        start = time.time()
+        gyro_data = serial_comm.request_gyro()
+        print(f"收到陀螺仪数据: {gyro_data}，耗时 {(time.time() - start) * 1000:.1f}ms")
+
+        # 过期后重新读取串口
+        time.sleep(0.2)
+        print("\n3. 缓存过期后请求")
+        start = time.time()
+        gyro_data = serial_comm.request_gyro()
+        print(f"收到陀螺仪数据: {gyro_data}，耗时 {(time.time() - start) * 1000:.1f}ms")
+
+        print("\n请求缓存测试完成!")
+
+    except KeyboardInterrupt:
+        print("测试终止")
+    except Exception as e:
+        print(f"发生错误: {e}")
+    finally:
+        serial_comm.close()
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,9 @@ import serial
 import time
 import struct
 import json
+import threading
+import copy
+from collections import deque
 
 class SerialComm:
     # 数据类型常量
@@ -15,11 +18,65 @@ class SerialComm:
     FRAME_HEADER = 0xAA
     FRAME_FOOTER = 0x55
 
-    def __init__(self, port, baudrate=115200, timeout=1):
+    # 发送优先级（数值越小越优先）
+    PRIORITY_CONTROL = 0  # 控制帧：设定值等时间敏感数据
+    PRIORITY_REQUEST = 1  # 请求帧
+    PRIORITY_BULK = 2     # 大块数据/遥测：字符串、JSON、陀螺仪
+    PRIORITY_NAMES = {
+        PRIORITY_CONTROL: 'control',
+        PRIORITY_REQUEST: 'request',
+        PRIORITY_BULK: 'bulk',
+    }
+    # 未指定优先级时按数据类型决定
+    DEFAULT_PRIORITY = {
+        TYPE_INT: PRIORITY_CONTROL,
+        TYPE_FLOAT: PRIORITY_CONTROL,
+        TYPE_REQUEST: PRIORITY_REQUEST,
+        TYPE_STRING: PRIORITY_BULK,
+        TYPE_JSON: PRIORITY_BULK,
+        TYPE_GYRO: PRIORITY_BULK,
+    }
+    TX_STATS_SAMPLES = 1000  # 每个优先级保留的排队延迟样本数
+    ECHO_TIMEOUT = 2.0       # 等待设备回显本机所发帧的最长时间（秒）
+
+    def __init__(self, port, baudrate=115200, timeout=1,
+                 tx_queue=False, tx_queue_size=64, tx_queue_timeout=1.0,
+                 cache_max_age=None):
         self.ser = serial.Serial(port, baudrate, timeout=timeout)
         time.sleep(2)  # 等待串口稳定
         self.buffer = bytearray()  # 初始化缓冲区
 
+        # 发送调度器（可选）：开启后 send_command 只负责入队，
+        # 由后台线程按优先级逐帧写入串口，每帧发送完成后再选下一帧
+        self.tx_queue_size = tx_queue_size
+        self.tx_queue_timeout = tx_queue_timeout
+        self._tx_cond = threading.Condition()
+        self._tx_queues = {p: deque() for p in self.PRIORITY_NAMES}
+        self._tx_running = False
+        self._tx_thread = None
+        self._write_lock = threading.Lock()  # 同步写入与发送线程共用，保证帧不被打断
+        self.reset_tx_stats()
+
+        # 接收信箱：每个解码出的帧按数据类型保存最新值，带递增序号，
+        # 这样任意线程解码的帧都能交给等待该类型的请求方
+        self._rx_seq = 0
+        self._latest = {}         # data_type -> (序号, 值)
+        # 设备会回显本机发送的每个非请求帧，记录尚未收到回显的帧，
+        # 收到后识别为回显，不当作设备数据
+        self._pending_echoes = deque()  # (过期时间, 帧)
+
+        # 响应缓存（可选）：按数据类型保存最近一次收到的值
+        self._cache = {}          # data_type -> (时间戳, 值)
+        self._cache_max_age = {}  # data_type -> 最大有效期（秒），只缓存已开启的类型
+        self._inflight = {}       # data_type -> 正在进行的请求，用于合并并发请求
+        self._cache_lock = threading.Lock()
+        self._rx_lock = threading.Lock()
+        if cache_max_age is not None:
+            self.enable_cache(cache_max_age)
+
+        if tx_queue:
+            self.start_tx_scheduler()
+
     def calculate_crc16(self, data):
         crc = 0xFFFF
         for byte in data:
@@ -80,12 +137,140 @@ class SerialComm:
             'data': data
         }
 
-    def send_command(self, data_type, data_bytes):
+    def send_command(self, data_type, data_bytes, priority=None):
+        if priority is not None and priority not in self.PRIORITY_NAMES:
+            raise ValueError(f"未知的发送优先级: {priority}，"
+                             f"可选值: {sorted(self.PRIORITY_NAMES)}")
         frame = self.build_frame(data_type, data_bytes)
-        self.ser.write(frame)
+        if priority is None:
+            priority = self.DEFAULT_PRIORITY.get(data_type, self.PRIORITY_BULK)
+
+        queued = self._enqueue_frame(priority, frame)
+        if queued is None:
+            # 调度器未运行（或正在停止）：直接同步写入
+            self._write_frame(frame)
+            return True
+        return queued
+
+    def _write_frame(self, frame):
+        with self._write_lock:
+            if frame[2] != self.TYPE_REQUEST:  # 请求帧不会被回显
+                with self._cache_lock:
+                    self._pending_echoes.append((time.monotonic() + self.ECHO_TIMEOUT, frame))
+            self.ser.write(frame)
         print(f"发送帧: {' '.join(f'{b:02X}' for b in frame)}")
 
+    def start_tx_scheduler(self):
+        """启动优先级发送调度器"""
+        with self._tx_cond:
+            if self._tx_thread is not None:
+                return
+            self._tx_running = True
+            self._tx_thread = threading.Thread(target=self._tx_loop, daemon=True)
+            self._tx_thread.start()
+
+    def stop_tx_scheduler(self):
+        """停止发送调度器，已入队的帧会先全部发送完"""
+        with self._tx_cond:
+            thread = self._tx_thread
+            if thread is None:
+                return
+            # 停止后新的帧不再入队，由 send_command 直接同步写入
+            self._tx_running = False
+            self._tx_cond.notify_all()
+        thread.join()
+        with self._tx_cond:
+            self._tx_thread = None
+
+    def _enqueue_frame(self, priority, frame):
+        """
+        把帧放入对应优先级的队列
+        返回 True 表示已入队，False 表示队列已满被丢弃，
+        None 表示调度器未运行（或正在停止），需由调用方直接写入
+        """
+        queue = self._tx_queues[priority]
+        with self._tx_cond:
+            if not self._tx_running:
+                return None
+            # 队列已满时阻塞等待（背压），超时则丢弃
+            if not self._tx_cond.wait_for(lambda: not self._tx_running
+                                          or len(queue) < self.tx_queue_size,
+                                          timeout=self.tx_queue_timeout):
+                self._tx_stats[priority]['dropped'] += 1
+                print(f"发送队列已满 ({self.PRIORITY_NAMES[priority]})，丢弃帧")
+                return False
+            if not self._tx_running:
+                return None
+            queue.append((time.monotonic(), frame))
+            self._tx_cond.notify_all()
+        return True
+
+    def _tx_loop(self):
+        while True:
+            with self._tx_cond:
+                self._tx_cond.wait_for(lambda: not self._tx_running
+                                       or any(self._tx_queues.values()))
+                # 每次只取一帧，保证高优先级帧在下一个帧边界即可插队
+                for priority in sorted(self._tx_queues):
+                    if self._tx_queues[priority]:
+                        enqueued_at, frame = self._tx_queues[priority].popleft()
+                        break
+                else:
+                    return  # 已停止且队列为空
+                self._tx_cond.notify_all()  # 唤醒等待队列空位的发送方
+
+            try:
+                self._write_frame(frame)
+                # write() 只是交给驱动缓冲区，等帧真正发完再选下一帧，
+                # 否则高优先级帧仍会排在驱动缓冲区中的大量数据之后
+                self.ser.flush()
+            except serial.SerialException as e:
+                print(f"发送失败: {e}")
+                continue
+
+            with self._tx_cond:
+                stats = self._tx_stats[priority]
+                stats['sent'] += 1
+                stats['delays'].append(time.monotonic() - enqueued_at)
+
+    def reset_tx_stats(self):
+        """清空发送调度器的统计数据"""
+        with self._tx_cond:
+            self._tx_stats = {
+                p: {'sent': 0, 'dropped': 0, 'delays': deque(maxlen=self.TX_STATS_SAMPLES)}
+                for p in self.PRIORITY_NAMES
+            }
+
+    def get_tx_stats(self):
+        """返回各优先级从入队到帧发送完成的延迟统计（单位：秒，基于最近的样本）"""
+        result = {}
+        with self._tx_cond:
+            for priority, name in self.PRIORITY_NAMES.items():
+                stats = self._tx_stats[priority]
+                delays = sorted(stats['delays'])
+                entry = {
+                    'sent': stats['sent'],
+                    'dropped': stats['dropped'],
+                    'queued': len(self._tx_queues[priority]),
+                    'mean': None,
+                    'p50': None,
+                    'p99': None,
+                    'max': None,
+                }
+                if delays:
+                    entry['mean'] = sum(delays) / len(delays)
+                    entry['p50'] = delays[len(delays) // 2]
+                    entry['p99'] = delays[min(len(delays) - 1, int(len(delays) * 0.99))]
+                    entry['max'] = delays[-1]
+                result[name] = entry
+        return result
+
     def read_echo(self):
+        # 所有接收路径都经过 _rx_lock，避免多个线程同时修改 self.buffer
+        with self._rx_lock:
+            return self._read_echo()
+
+    def _read_echo(self):
         # 读取所有可用数据到缓冲区
         while self.ser.in_waiting > 0:
             self.buffer.extend(self.ser.read(self.ser.in_waiting))
@@ -197,6 +382,7 @@ class SerialComm:
                 
                 if result is not None:
                     results.append(result)
+                    self._store_frame(data_type, result, frame)
                 
                 # 继续处理下一帧
                 processed_index = header_index + total_frame_size
@@ -223,33 +409,149 @@ class SerialComm:
     def request_float(self):
         """发送请求获取浮点数的命令"""
         print("请求浮点数数据...")
-        # 创建请求浮点数据的数据包，使用TYPE_FLOAT作为请求的数据类型
-        data_bytes = bytes([self.TYPE_FLOAT])
-        self.send_command(self.TYPE_REQUEST, data_bytes)
-        
-        # 等待响应并返回
-        return self.read_response()
+        return self._request(self.TYPE_FLOAT)
     
     def request_int(self):
         """发送请求获取整数的命令"""
         print("请求整数数据...")
-        data_bytes = bytes([self.TYPE_INT])
-        self.send_command(self.TYPE_REQUEST, data_bytes)
-        return self.read_response()
+        return self._request(self.TYPE_INT)
 
     def request_string(self):
         """发送请求获取字符串的命令"""
         print("请求字符串数据...")
-        data_bytes = bytes([self.TYPE_STRING])
-        self.send_command(self.TYPE_REQUEST, data_bytes)
-        return self.read_response()
+        return self._request(self.TYPE_STRING)
 
     def request_json(self):
         """发送请求获取JSON的命令"""
         print("请求JSON数据...")
-        data_bytes = bytes([self.TYPE_JSON])
-        self.send_command(self.TYPE_REQUEST, data_bytes)
-        return self.read_response()
+        return self._request(self.TYPE_JSON)
+
+    def _request(self, data_type, timeout=2.0):
+        """发送数据请求；对已开启缓存的类型先查缓存，并合并并发的相同请求"""
+        if data_type not in self._cache_max_age:
+            return self._send_request(data_type, timeout)
+
+        with self._cache_lock:
+            # 在锁内检查缓存，避免刚完成的请求结果被错过而重复发送请求
+            value = self._get_cached_locked(data_type)
+            if value is not None:
+                return self._copy_value(value)
+            pending = self._inflight.get(data_type)
+            owner = pending is None
+            if owner:
+                pending = {'event': threading.Event(), 'result': None}
+                self._inflight[data_type] = pending
+
+        if not owner:
+            # 已有相同请求在进行中，等待其结果即可（发起方总会在超时后结束）
+            pending['event'].wait()
+            return self._copy_value(pending['result'])
+
+        try:
+            pending['result'] = self._send_request(data_type, timeout)
+        finally:
+            with self._cache_lock:
+                del self._inflight[data_type]
+            pending['event'].set()
+        return self._copy_value(pending['result'])
+
+    def _send_request(self, data_type, timeout):
+        """发送请求并等待请求发出之后解码到的该类型数据"""
+        # 先处理已经到达的数据，之后解码的设备帧才算本次响应（回显不计入）
+        self.read_echo()
+        with self._cache_lock:
+            since = self._rx_seq
+
+        if not self.send_command(self.TYPE_REQUEST, bytes([data_type])):
+            return None  # 请求帧被丢弃，不必等待响应
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            self.read_echo()
+            with self._cache_lock:
+                entry = self._latest.get(data_type)
+            if entry is not None and entry[0] > since:
+                return entry[1]
+            time.sleep(0.01)
+
+        print("等待响应超时")
+        return None
+
+    def enable_cache(self, max_age, data_types=None):
+        """
+        为 request_* 开启响应缓存
+        max_age: 缓存有效期（秒）
+        data_types: 要缓存的数据类型列表，默认所有可请求的类型
+        本机所发帧的回显不会进入缓存
+        """
+        if data_types is None:
+            data_types = [self.TYPE_INT, self.TYPE_FLOAT, self.TYPE_STRING,
+                          self.TYPE_JSON, self.TYPE_GYRO]
+        with self._cache_lock:
+            for data_type in data_types:
+                self._cache_max_age[data_type] = max_age
+
+    def disable_cache(self, data_types=None):
+        """关闭响应缓存，默认关闭所有类型"""
+        with self._cache_lock:
+            if data_types is None:
+                data_types = list(self._cache_max_age)
+            for data_type in data_types:
+                self._cache_max_age.pop(data_type, None)
+                self._cache.pop(data_type, None)
+
+    def invalidate_cache(self, data_types=None):
+        """清除缓存的值，下次请求会重新读取串口"""
+        with self._cache_lock:
+            if data_types is None:
+                self._cache.clear()
+            else:
+                for data_type in data_types:
+                    self._cache.pop(data_type, None)
+
+    def get_cached(self, data_type):
+        """返回未过期的缓存值，没有则返回 None"""
+        with self._cache_lock:
+            value = self._get_cached_locked(data_type)
+        return self._copy_value(value)
+
+    def _get_cached_locked(self, data_type):
+        # 调用方需持有 _cache_lock
+        max_age = self._cache_max_age.get(data_type)
+        entry = self._cache.get(data_type)
+        if max_age is None or entry is None:
+            return None
+        if time.monotonic() - entry[0] > max_age:
+            return None
+        return entry[1]
+
+    def _take_echo(self, frame):
+        # 调用方需持有 _cache_lock；frame 是本机发送过的帧的回显时返回 True
+        now = time.monotonic()
+        while self._pending_echoes and self._pending_echoes[0][0] < now:
+            self._pending_echoes.popleft()  # 回显丢失，不再等待
+        for item in self._pending_echoes:
+            if item[1] == frame:
+                self._pending_echoes.remove(item)
+                return True
+        return False
+
+    def _store_frame(self, data_type, value, frame):
+        with self._cache_lock:
+            if self._take_echo(frame):
+                return
+            # 保存副本，调用方修改 read_echo 的返回值不会影响信箱和缓存
+            value = self._copy_value(value)
+            self._rx_seq += 1
+            self._latest[data_type] = (self._rx_seq, value)
+            if data_type in self._cache_max_age:
+                self._cache[data_type] = (time.monotonic(), value)
+
+    def _copy_value(self, value):
+        # 字典/列表可能被调用方修改，返回副本避免影响缓存
+        if isinstance(value, (dict, list)):
+            return copy.deepcopy(value)
+        return value
 
     def read_response(self, timeout=2.0):
         """读取响应数据，带超时机制"""
@@ -266,26 +568,25 @@ class SerialComm:
     def request_gyro(self):
         """发送请求获取陀螺仪数据的命令"""
         print("请求陀螺仪数据...")
-        data_bytes = bytes([self.TYPE_GYRO])
-        self.send_command(self.TYPE_REQUEST, data_bytes)
-        return self.read_response()
+        return self._request(self.TYPE_GYRO)
 
-    def send_int(self, int_value):
+    def send_int(self, int_value, priority=None):
         data_bytes = int_value.to_bytes(2, byteorder='big', signed=True)
-        self.send_command(self.TYPE_INT, data_bytes)
+        return self.send_command(self.TYPE_INT, data_bytes, priority)
 
-    def send_float(self, float_value):
+    def send_float(self, float_value, priority=None):
         data_bytes = struct.pack('>f', float_value)  # 大端
-        self.send_command(self.TYPE_FLOAT, data_bytes)
+        return self.send_command(self.TYPE_FLOAT, data_bytes, priority)
 
-    def send_string(self, string_value):
+    def send_string(self, string_value, priority=None):
         data_bytes = string_value.encode('utf-8')
-        self.send_command(self.TYPE_STRING, data_bytes)
+        return self.send_command(self.TYPE_STRING, data_bytes, priority)
 
-    def send_json(self, json_dict):
+    def send_json(self, json_dict, priority=None):
         json_str = json.dumps(json_dict)
         data_bytes = json_str.encode('utf-8')
-        self.send_command(self.TYPE_JSON, data_bytes)
+        return self.send_command(self.TYPE_JSON, data_bytes, priority)
 
     def close(self):
+        self.stop_tx_scheduler()
         self.ser.close()
\ No newline at end of file
@@ -0,0 +1,46 @@
+# tx_priority_test.py
+from serial_comm import SerialComm
+import time
+
+def print_stats(stats):
+    for name, entry in stats.items():
+        if entry['sent'] == 0:
+            print(f"{name}: 无数据")
+            continue
+        print(f"{name}: 已发送 {entry['sent']}, 丢弃 {entry['dropped']}, 排队 {entry['queued']}, "
+              f"平均 {entry['mean'] * 1000:.1f}ms, p99 {entry['p99'] * 1000:.1f}ms, "
+              f"最大 {entry['max'] * 1000:.1f}ms")
+
+def main():
+    # 替换为您的串口名称，tx_queue=True 开启优先级发送调度器
+    serial_comm = SerialComm('COM10', tx_queue=True)  # Windows示例
+    # serial_comm = SerialComm('/dev/ttyUSB0', tx_queue=True)  # Linux示例
+
+    try:
+        print("\n===== 优先级发送测试 =====")
+
+        # 先塞入大量JSON（bulk），再周期性发送整数设定值（control）
+        print("\n1. 发送大块JSON数据")
+        for i in range(50):
+            serial_comm.send_json({"index": i, "payload": "x" * 120})
+
+        print("\n2. 在负载下发送整数设定值")
+        for i in range(20):
+            serial_comm.send_int(i)
+            time.sleep(0.02)
+
+        # 控制帧的排队延迟应不超过约一个大块帧的发送时间
+        print("\n3. 排队延迟统计")
+        print_stats(serial_comm.get_tx_stats())
+
+        print("\n优先级发送测试完成!")
+
+    except KeyboardInterrupt:
+        print("测试终止")
+    except Exception as e:
+        print(f"发生错误: {e}")
+    finally:
+        serial_comm.close()
+
+if __name__ == "__main__":
+    main()
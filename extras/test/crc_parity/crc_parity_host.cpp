@@ -0,0 +1,40 @@
+// PyArduTalk CRC 主机测试程序
+// 从标准输入逐行读取十六进制数据（如 "01 30 39"），输出两种方式计算的 CRC：
+//   <整体计算> <逐字节增量计算>
+// 由 crc_parity_test.py 编译并调用，与 serial_comm.py 的结果比对
+
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <string>
+#include <vector>
+#include <iostream>
+
+#include "PyArduTalkCRC.h"
+
+int main() {
+    std::string line;
+    while (std::getline(std::cin, line)) {
+        std::vector<uint8_t> data;
+        const char* p = line.c_str();
+        char* end;
+        while (*p) {
+            unsigned long value = strtoul(p, &end, 16);
+            if (end == p) {
+                break;
+            }
+            data.push_back((uint8_t)value);
+            p = end;
+        }
+
+        uint16_t bulk = PyArduTalkCRC::calculate(data.data(), data.size());
+
+        uint16_t incremental = PyArduTalkCRC::CRC16_INIT;
+        for (size_t i = 0; i < data.size(); i++) {
+            incremental = PyArduTalkCRC::update(incremental, data[i]);
+        }
+
+        printf("%04X %04X\n", bulk, incremental);
+    }
+    return 0;
+}
@@ -0,0 +1,92 @@
+"""
+PyArduTalk CRC 一致性测试
+在主机上编译固件的查表 CRC 实现 (src/PyArduTalkCRC.cpp)，
+并与 examples/python/serial_comm.py 中的 calculate_crc16 逐一比对
+
+用法: python extras/test/crc_parity/crc_parity_test.py
+需要: g++ (或通过环境变量 CXX 指定编译器)、pyserial
+"""
+
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.abspath(os.path.join(HERE, '..', '..', '..'))
+SRC_DIR = os.path.join(ROOT, 'src')
+
+sys.path.insert(0, os.path.join(ROOT, 'examples', 'python'))
+from serial_comm import SerialComm
+
+
+def build_harness(out_dir):
+    """编译主机测试程序，返回可执行文件路径"""
+    cxx = os.environ.get('CXX', 'g++')
+    exe = os.path.join(out_dir, 'crc_parity_host')
+    cmd = [cxx, '-std=c++11', '-Wall', '-O2', '-I', SRC_DIR,
+           os.path.join(HERE, 'crc_parity_host.cpp'),
+           os.path.join(SRC_DIR, 'PyArduTalkCRC.cpp'),
+           '-o', exe]
+    subprocess.run(cmd, check=True)
+    return exe
+
+
+def make_vectors():
+    """生成测试数据：边界情况 + 真实帧内容 + 随机数据"""
+    comm = SerialComm.__new__(SerialComm)  # 不打开串口，只使用帧构建方法
+    vectors = [
+        b'',
+        b'\x00',
+        b'\xFF',
+        b'123456789',
+        bytes(range(256)),
+    ]
+    # 真实帧中参与 CRC 的部分：类型 + 数据
+    for data_type, data in [
+        (SerialComm.TYPE_INT, (12345).to_bytes(2, 'big', signed=True)),
+        (SerialComm.TYPE_FLOAT, bytes.fromhex('C2F6E666')),
+        (SerialComm.TYPE_STRING, 'Hello, Arduino!'.encode('utf-8')),
+        (SerialComm.TYPE_REQUEST, bytes([SerialComm.TYPE_GYRO])),
+    ]:
+        frame = comm.build_frame(data_type, data)
+        vectors.append(frame[2:-3])
+
+    rng = random.Random(0)
+    for _ in range(200):
+        length = rng.randint(1, 254)
+        vectors.append(bytes(rng.randrange(256) for _ in range(length)))
+    return vectors
+
+
+def main():
+    vectors = make_vectors()
+    with tempfile.TemporaryDirectory() as tmp:
+        exe = build_harness(tmp)
+        stdin = ''.join(' '.join(f'{b:02X}' for b in v) + '\n' for v in vectors)
+        output = subprocess.run([exe], input=stdin, capture_output=True,
+                                text=True, check=True).stdout.splitlines()
+
+    if len(output) != len(vectors):
+        print(f"输出行数不匹配: 预期 {len(vectors)}，实际 {len(output)}")
+        return 1
+
+    failures = 0
+    for data, line in zip(vectors, output):
+        bulk, incremental = (int(x, 16) for x in line.split())
+        expected = SerialComm.calculate_crc16(None, data)
+        if bulk != expected or incremental != expected:
+            failures += 1
+            print(f"CRC不一致: 数据 {data[:16].hex()}... 预期 {expected:04X}，"
+                  f"整体 {bulk:04X}，增量 {incremental:04X}")
+
+    if failures:
+        print(f"失败 {failures}/{len(vectors)}")
+        return 1
+    print(f"全部 {len(vectors)} 组数据 CRC 一致")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,231 @@
+"""
+PyArduTalk 请求缓存测试
+用模拟设备代替串口，检查 serial_comm.py 中 request_* 的缓存、合并与响应匹配：
+  1. 本机所发帧的回显（即使晚于请求到达）不能被当作响应，也不进入缓存
+  2. 部分类型开启缓存时，并发请求未缓存类型仍能拿到自己的响应
+  3. 并发的相同请求只发出一次
+  4. 请求帧被发送队列丢弃时立即返回 None
+  5. 合并等待的请求方不会先于发起方超时
+  6. 修改 read_echo 的返回值不影响缓存
+
+用法: python extras/test/request_cache/request_cache_test.py
+需要: pyserial
+"""
+
+import contextlib
+import io
+import os
+import sys
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.abspath(os.path.join(HERE, '..', '..', '..'))
+sys.path.insert(0, os.path.join(ROOT, 'examples', 'python'))
+import serial_comm
+from serial_comm import SerialComm
+
+# 模拟设备对各类型请求的响应
+RESPONSES = {
+    SerialComm.TYPE_INT: (7).to_bytes(2, 'big', signed=True),
+    SerialComm.TYPE_FLOAT: bytes.fromhex('3FC00000'),  # 1.5
+    SerialComm.TYPE_GYRO: bytes.fromhex('0096FF1F012C'),  # 1.5, -2.25, 3.0
+}
+
+
+class FakeDevice:
+    """模拟固件行为：非请求帧延迟 echo_delay 秒后回显，请求帧延迟 delay 秒后响应"""
+
+    def __init__(self, delay=0.05, echo_delay=0.005):
+        self.delay = delay
+        self.echo_delay = echo_delay
+        self.rx = bytearray()
+        self.pending = []
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.writable = threading.Event()  # 清除后写入会阻塞，用于模拟发送拥塞
+        self.writable.set()
+        self.builder = SerialComm.__new__(SerialComm)
+
+    def write(self, frame):
+        self.writable.wait()
+        with self.lock:
+            if frame[2] == SerialComm.TYPE_REQUEST:
+                self.requests += 1
+                data_type = frame[3]
+                response = self.builder.build_frame(data_type, RESPONSES[data_type])
+                self.pending.append((time.monotonic() + self.delay, response))
+            else:
+                self.pending.append((time.monotonic() + self.echo_delay, bytes(frame)))
+
+    def inject(self, frame):
+        """模拟设备主动发送的帧"""
+        with self.lock:
+            self.rx += frame
+
+    @property
+    def in_waiting(self):
+        with self.lock:
+            now = time.monotonic()
+            for item in sorted(p for p in self.pending if p[0] <= now):
+                self.rx += item[1]
+                self.pending.remove(item)
+            return len(self.rx)
+
+    def read(self, size):
+        with self.lock:
+            data = bytes(self.rx[:size])
+            del self.rx[:size]
+            return data
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def open_comm(**kwargs):
+    """创建连接到模拟设备的 SerialComm（跳过打开串口后的等待）"""
+    orig_serial, orig_sleep = serial_comm.serial.Serial, serial_comm.time.sleep
+    serial_comm.serial.Serial = lambda *args, **kw: FakeDevice()
+    serial_comm.time.sleep = lambda seconds: None
+    try:
+        return SerialComm('fake', **kwargs)
+    finally:
+        serial_comm.serial.Serial, serial_comm.time.sleep = orig_serial, orig_sleep
+
+
+def run_concurrently(*funcs):
+    results = [None] * len(funcs)
+
+    def worker(i, func):
+        results[i] = func()
+
+    threads = [threading.Thread(target=worker, args=(i, f)) for i, f in enumerate(funcs)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_stale_echo_not_taken_as_response():
+    for kwargs in ({}, {'cache_max_age': 1.0}, {'tx_queue': True}):
+        comm = open_comm(**kwargs)
+        comm.send_int(42)  # 回显在请求发出之后才到达
+        result = comm.request_int()
+        comm.close()
+        assert result == 7, f"{kwargs}: 预期设备响应 7，实际 {result}"
+
+
+def test_own_frames_not_cached():
+    comm = open_comm(cache_max_age=1.0)
+    comm.send_int(42)
+    comm.send_float(2.5)
+    time.sleep(0.02)
+    assert comm.read_echo() == 2.5, "read_echo 仍应返回回显"
+    assert comm.get_cached(SerialComm.TYPE_INT) is None, "回显不应进入缓存"
+    assert comm.get_cached(SerialComm.TYPE_FLOAT) is None, "回显不应进入缓存"
+
+
+def test_uncached_type_with_concurrent_reader():
+    comm = open_comm()
+    comm.enable_cache(1.0, [SerialComm.TYPE_GYRO])
+    for _ in range(5):
+        comm.invalidate_cache()
+        gyro, value = run_concurrently(comm.request_gyro, comm.request_float)
+        assert gyro == {'yaw': 1.5, 'roll': -2.25, 'pitch': 3.0}, f"陀螺仪响应错误: {gyro}"
+        assert value == 1.5, f"浮点数响应错误: {value}"
+
+
+def test_coalesced_requests():
+    comm = open_comm(cache_max_age=1.0)
+    results = run_concurrently(*[comm.request_gyro] * 8)
+    assert all(r == {'yaw': 1.5, 'roll': -2.25, 'pitch': 3.0} for r in results), results
+    assert comm.ser.requests == 1, f"预期只发出 1 次请求，实际 {comm.ser.requests}"
+    comm.request_gyro()
+    assert comm.ser.requests == 1, "缓存有效期内不应再次请求"
+
+
+def test_dropped_request_returns_immediately():
+    comm = open_comm(cache_max_age=1.0, tx_queue=True, tx_queue_size=1, tx_queue_timeout=0.01)
+    # 写入阻塞：第一帧卡在发送线程中，第二帧占满 request 队列
+    comm.ser.writable.clear()
+    comm.send_command(SerialComm.TYPE_REQUEST, bytes([SerialComm.TYPE_INT]))
+    while comm.get_tx_stats()['request']['queued'] != 0:
+        time.sleep(0.001)
+    comm.send_command(SerialComm.TYPE_REQUEST, bytes([SerialComm.TYPE_INT]))
+
+    start = time.monotonic()
+    results = run_concurrently(*[comm.request_float] * 3)
+    elapsed = time.monotonic() - start
+    comm.ser.writable.set()
+    comm.close()
+    assert results == [None] * 3, results
+    assert elapsed < 0.5, f"请求被丢弃后仍等待了 {elapsed:.2f}s"
+
+
+def test_waiters_follow_owner():
+    comm = open_comm(cache_max_age=1.0, tx_queue=True, tx_queue_size=1, tx_queue_timeout=1.0)
+    # 请求队列被占满：发起方要等约 0.3s 才能把请求放入队列
+    comm.ser.writable.clear()
+    comm.send_command(SerialComm.TYPE_REQUEST, bytes([SerialComm.TYPE_INT]))
+    while comm.get_tx_stats()['request']['queued'] != 0:
+        time.sleep(0.001)
+    comm.send_command(SerialComm.TYPE_REQUEST, bytes([SerialComm.TYPE_INT]))
+    threading.Timer(0.3, comm.ser.writable.set).start()
+
+    def request():
+        return comm._request(SerialComm.TYPE_FLOAT, timeout=0.2)
+
+    owner = [None]
+    owner_thread = threading.Thread(target=lambda: owner.__setitem__(0, request()))
+    owner_thread.start()
+    time.sleep(0.02)
+    waiters = run_concurrently(request, request)
+    owner_thread.join()
+    comm.close()
+    assert owner[0] == 1.5, f"发起方响应错误: {owner[0]}"
+    assert waiters == [1.5, 1.5], f"等待方先于发起方超时: {waiters}"
+    assert comm.ser.requests == 3, f"预期 3 次请求，实际 {comm.ser.requests}"
+
+
+def test_read_echo_result_does_not_corrupt_cache():
+    comm = open_comm(cache_max_age=1.0)
+    comm.ser.inject(comm.build_frame(SerialComm.TYPE_GYRO, RESPONSES[SerialComm.TYPE_GYRO]))
+    result = comm.read_echo()
+    result['yaw'] = 999
+    cached = comm.get_cached(SerialComm.TYPE_GYRO)
+    assert cached == {'yaw': 1.5, 'roll': -2.25, 'pitch': 3.0}, f"缓存被修改: {cached}"
+
+
+def main():
+    tests = [
+        test_stale_echo_not_taken_as_response,
+        test_own_frames_not_cached,
+        test_uncached_type_with_concurrent_reader,
+        test_coalesced_requests,
+        test_dropped_request_returns_immediately,
+        test_waiters_follow_owner,
+        test_read_echo_result_does_not_corrupt_cache,
+    ]
+    failures = 0
+    for test in tests:
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                test()
+            print(f"通过: {test.__name__}")
+        except AssertionError as e:
+            failures += 1
+            print(f"失败: {test.__name__}: {e}")
+
+    if failures:
+        print(f"失败 {failures}/{len(tests)}")
+        return 1
+    print(f"全部 {len(tests)} 项测试通过")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
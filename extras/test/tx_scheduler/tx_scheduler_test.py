@@ -0,0 +1,206 @@
+"""
+PyArduTalk 发送调度器测试
+用模拟串口代替硬件，检查 serial_comm.py 中优先级发送调度器的行为：
+  1. 未知优先级抛出 ValueError
+  2. 队列有界，队列满时丢弃并计数
+  3. 控制帧在帧边界插队到已排队的大块帧之前
+  4. 延迟统计包含帧在线路上的发送时间
+  5. close() 先发完队列中的帧
+  6. 与 close() 并发的发送不会丢帧
+
+用法: python extras/test/tx_scheduler/tx_scheduler_test.py
+需要: pyserial
+"""
+
+import contextlib
+import io
+import os
+import sys
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.abspath(os.path.join(HERE, '..', '..', '..'))
+sys.path.insert(0, os.path.join(ROOT, 'examples', 'python'))
+import serial_comm
+from serial_comm import SerialComm
+
+BAUDRATE = 115200
+BULK_JSON = {"payload": "x" * 150}
+
+
+class FakePort:
+    """模拟串口：write() 立即返回，flush() 等到数据按波特率发送完毕"""
+
+    def __init__(self):
+        self.frames = []  # 已写入的帧，按写入顺序
+        self.busy_until = 0.0
+        self.lock = threading.Lock()
+        self.writable = threading.Event()  # 清除后写入会阻塞，用于模拟发送拥塞
+        self.writable.set()
+        self.in_waiting = 0
+
+    def write(self, frame):
+        self.writable.wait()
+        with self.lock:
+            now = time.monotonic()
+            self.busy_until = max(now, self.busy_until) + len(frame) * 10 / BAUDRATE
+            self.frames.append(bytes(frame))
+        return len(frame)
+
+    def flush(self):
+        with self.lock:
+            remaining = self.busy_until - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def close(self):
+        pass
+
+    def types(self):
+        with self.lock:
+            return [frame[2] for frame in self.frames]
+
+
+def open_comm(**kwargs):
+    """创建连接到模拟串口的 SerialComm（跳过打开串口后的等待）"""
+    orig_serial, orig_sleep = serial_comm.serial.Serial, serial_comm.time.sleep
+    serial_comm.serial.Serial = lambda *args, **kw: FakePort()
+    serial_comm.time.sleep = lambda seconds: None
+    try:
+        return SerialComm('fake', **kwargs)
+    finally:
+        serial_comm.serial.Serial, serial_comm.time.sleep = orig_serial, orig_sleep
+
+
+def frame_time(comm, data_type, data_bytes):
+    return len(comm.build_frame(data_type, data_bytes)) * 10 / BAUDRATE
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "等待超时"
+        time.sleep(0.001)
+
+
+def test_invalid_priority():
+    for tx_queue in (False, True):
+        comm = open_comm(tx_queue=tx_queue)
+        try:
+            comm.send_int(1, priority=7)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"tx_queue={tx_queue} 时未抛出 ValueError")
+        finally:
+            comm.close()
+        assert comm.ser.frames == [], "无效优先级的帧不应被发送"
+
+
+def test_bounded_queue_drops():
+    comm = open_comm(tx_queue=True, tx_queue_size=2, tx_queue_timeout=0.01)
+    comm.ser.writable.clear()
+    comm.send_json(BULK_JSON)  # 第一帧被发送线程取走并阻塞在 write()
+    wait_until(lambda: comm.get_tx_stats()['bulk']['queued'] == 0)
+
+    results = [comm.send_json(BULK_JSON) for _ in range(5)]
+    stats = comm.get_tx_stats()['bulk']
+    comm.ser.writable.set()
+    comm.close()
+
+    assert results == [True, True, False, False, False], results
+    assert stats['dropped'] == 3, f"预期丢弃 3 帧，实际 {stats['dropped']}"
+    assert len(comm.ser.frames) == 3, f"预期发送 3 帧，实际 {len(comm.ser.frames)}"
+
+
+def test_control_preempts_bulk():
+    comm = open_comm(tx_queue=True)
+    comm.ser.writable.clear()
+    comm.send_json(BULK_JSON)
+    wait_until(lambda: comm.get_tx_stats()['bulk']['queued'] == 0)
+    for _ in range(5):
+        comm.send_json(BULK_JSON)
+    comm.send_int(100)
+    comm.ser.writable.set()
+    comm.close()
+
+    types = comm.ser.types()
+    assert types[:2] == [SerialComm.TYPE_JSON, SerialComm.TYPE_INT], types
+    assert len(types) == 7, types
+
+
+def test_stats_include_wire_time():
+    comm = open_comm(tx_queue=True)
+    bulk_time = frame_time(comm, SerialComm.TYPE_JSON, str(BULK_JSON).encode())
+    for _ in range(20):
+        comm.send_json(BULK_JSON)
+    time.sleep(bulk_time * 3)
+    for i in range(5):
+        comm.send_int(i)
+        time.sleep(bulk_time)
+    comm.close()
+
+    stats = comm.get_tx_stats()
+    # 大块帧的延迟至少包含自身在线路上的时间，后面的帧还要等前面的帧发完
+    assert stats['bulk']['max'] >= bulk_time * 10, stats['bulk']
+    # 控制帧最多等待一个正在发送的大块帧
+    assert stats['control']['sent'] == 5, stats['control']
+    assert stats['control']['max'] < bulk_time * 2 + 0.02, stats['control']
+
+
+def test_drain_on_close():
+    comm = open_comm(tx_queue=True)
+    for _ in range(10):
+        comm.send_json(BULK_JSON)
+    comm.close()
+    assert len(comm.ser.frames) == 10, f"close() 后只发送了 {len(comm.ser.frames)} 帧"
+
+
+def test_send_racing_close():
+    comm = open_comm(tx_queue=True)
+    accepted = []
+
+    def sender():
+        for i in range(300):
+            if comm.send_int(i):
+                accepted.append(i)
+
+    thread = threading.Thread(target=sender)
+    thread.start()
+    time.sleep(0.005)
+    comm.close()
+    thread.join()
+
+    assert len(comm.ser.frames) == len(accepted), \
+        f"返回 True 的帧 {len(accepted)} 个，实际发送 {len(comm.ser.frames)} 个"
+
+
+def main():
+    tests = [
+        test_invalid_priority,
+        test_bounded_queue_drops,
+        test_control_preempts_bulk,
+        test_stats_include_wire_time,
+        test_drain_on_close,
+        test_send_racing_close,
+    ]
+    failures = 0
+    for test in tests:
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                test()
+            print(f"通过: {test.__name__}")
+        except AssertionError as e:
+            failures += 1
+            print(f"失败: {test.__name__}: {e}")
+
+    if failures:
+        print(f"失败 {failures}/{len(tests)}")
+        return 1
+    print(f"全部 {len(tests)} 项测试通过")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
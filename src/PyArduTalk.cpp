@@ -3,7 +3,7 @@
 // 在PyArduTalk构造函数的初始化列表中添加
 PyArduTalk::PyArduTalk(HardwareSerial& serialPort)
     : Serial_sw(serialPort), currentState(WAIT_HEADER), dataLength(0), originalLength(0),
-      dataType(0), crcIndex(0), dataIndex(0), crcReceived(0), crcCalculated(0),
+      dataType(0), dataIndex(0), crcReceived(0), crcCalculated(0), txCrc(0),
       lastStateChangeTime(0), syncBufferIndex(0), syncBufferLength(0),
       intCallback(nullptr), floatCallback(nullptr), stringCallback(nullptr), jsonCallback(nullptr),
       requestCallback(nullptr), echoCallback(nullptr), gyroCallback(nullptr) {  // 添加 gyroCallback 初始化
@@ -28,34 +28,8 @@ void PyArduTalk::sendGyro(float yaw, float roll, float pitch) {
     gyroBytes[4] = (pitchInt >> 8) & 0xFF;
     gyroBytes[5] = pitchInt & 0xFF;
     
-    // 计算数据包长度：类型(1字节) + 数据(6字节)
-    byte length = 1 + 6;
-    
-    // 构建完整帧
-    byte frame[1 + 1 + 1 + 6 + 2 + 1]; // 帧头+长度+类型+数据+CRC(2字节)+帧尾
-    int idx = 0;
-    
-    frame[idx++] = FRAME_HEADER;
-    frame[idx++] = length;
-    frame[idx++] = TYPE_GYRO;
-    
-    // 复制陀螺仪数据
-    memcpy(&frame[idx], gyroBytes, 6);
-    idx += 6;
-    
-    // 计算CRC（包括类型字节和数据）
-    byte crc_input[7]; // 类型(1字节) + 数据(6字节)
-    crc_input[0] = TYPE_GYRO;
-    memcpy(&crc_input[1], gyroBytes, 6);
-    
-    uint16_t crc = calculateCRC16(crc_input, 7);
-    frame[idx++] = highByte(crc);
-    frame[idx++] = lowByte(crc);
-    
-    frame[idx++] = FRAME_FOOTER;
-    
-    // 发送帧
-    Serial_sw.write(frame, idx);
+    // 发送帧（CRC 包括类型字节和数据）
+    writeFrame(TYPE_GYRO, gyroBytes, sizeof(gyroBytes));
 }
 
 // 添加设置陀螺仪回调的方法实现
@@ -85,18 +59,7 @@ void PyArduTalk::loop() {
 }
 
 uint16_t PyArduTalk::calculateCRC16(const byte *data, size_t length) {
-    uint16_t crc = 0xFFFF;
-    for (size_t i = 0; i < length; i++) {
-        crc ^= ((uint16_t)data[i] << 8);
-        for (uint8_t j = 0; j < 8; j++) {
-            if (crc & 0x8000) {
-                crc = (crc << 1) ^ 0x1021;
-            } else {
-                crc <<= 1;
-            }
-        }
-    }
-    return crc;
+    return PyArduTalkCRC::calculate(data, length);
 }
 
 bool PyArduTalk::checkTimeout() {
@@ -113,7 +76,7 @@ void PyArduTalk::resetStateMachine() {
     dataLength = 0;
     originalLength = 0;
     dataIndex = 0;
-    crcIndex = 0;
+    crcCalculated = PyArduTalkCRC::CRC16_INIT;
 }
 
 // 将字节添加到同步缓冲区的辅助方法
@@ -181,10 +144,8 @@ void PyArduTalk::receiveData(byte incomingByte) {
             dataLength = incomingByte;
             originalLength = incomingByte;
             if (dataLength > 0 && dataLength <= sizeof(dataBuffer) + 1) {
-                crcIndex = 0;
                 dataIndex = 0;
-                memset(crcBuffer, 0, sizeof(crcBuffer));
-                memset(dataBuffer, 0, sizeof(dataBuffer));
+                crcCalculated = PyArduTalkCRC::CRC16_INIT;
                 currentState = READ_TYPE;
                 Serial.print(F("帧长度: "));
                 Serial.println(dataLength);
@@ -204,7 +165,7 @@ void PyArduTalk::receiveData(byte incomingByte) {
             }
             
             dataType = incomingByte;
-            crcBuffer[crcIndex++] = dataType;
+            crcCalculated = PyArduTalkCRC::update(crcCalculated, dataType);
             dataLength -= 1;
             currentState = READ_DATA;
             Serial.print(F("数据类型: 0x"));
@@ -221,9 +182,7 @@ void PyArduTalk::receiveData(byte incomingByte) {
             
             if (dataIndex < sizeof(dataBuffer)) {
                 dataBuffer[dataIndex++] = incomingByte;
-                if (crcIndex < sizeof(crcBuffer)) {
-                    crcBuffer[crcIndex++] = incomingByte;
-                }
+                crcCalculated = PyArduTalkCRC::update(crcCalculated, incomingByte);
                 dataLength -= 1;
                 
                 if (dataLength == 0) {
@@ -256,7 +215,7 @@ void PyArduTalk::receiveData(byte incomingByte) {
             }
             
             crcReceived |= incomingByte;
-            crcCalculated = calculateCRC16(crcBuffer, originalLength);
+            // crcCalculated 已在 READ_TYPE/READ_DATA 中逐字节更新完毕
             
             if (crcReceived == crcCalculated) {
                 currentState = WAIT_FOOTER;
@@ -389,150 +348,86 @@ void PyArduTalk::processFrame() {
 }
 
 void PyArduTalk::echoFrame() {
-    byte frame[1 + 1 + 1 + 256 + 2 + 1]; // 最大帧大小
-    int frameIndex = 0;
-
-    // 帧头
-    frame[frameIndex++] = FRAME_HEADER;
-
-    // 使用 originalLength 来设置长度
-    frame[frameIndex++] = originalLength;
-
-    // 类型
-    frame[frameIndex++] = dataType;
-
-    // 数据
-    memcpy(&frame[frameIndex], dataBuffer, originalLength - 1); // originalLength 包含类型字节
-    frameIndex += (originalLength - 1);
-
-    // CRC
-    crcCalculated = calculateCRC16(crcBuffer, originalLength); // 类型 + 数据
-    frame[frameIndex++] = highByte(crcCalculated);
-    frame[frameIndex++] = lowByte(crcCalculated);
-
-    // 帧尾
-    frame[frameIndex++] = FRAME_FOOTER;
+    size_t payloadLength = originalLength - 1; // originalLength 包含类型字节
 
     // 输出调试信息
-    Serial.print("发送回显帧: ");
-    for (size_t i = 0; i < frameIndex; i++) {
-        Serial.printf("%02X ", frame[i]);
-    }
-    Serial.println();
+    Serial.print(F("发送回显帧, 类型: 0x"));
+    Serial.print(dataType, HEX);
+    Serial.print(F(", 数据长度: "));
+    Serial.println(payloadLength);
 
-    // 显式发送回显数据
-    Serial_sw.write(frame, frameIndex);
+    // 直接从 dataBuffer 流式发送回显数据
+    writeFrame(dataType, dataBuffer, payloadLength);
     Serial_sw.flush(); // 确保数据被发送出去
 
-    // 调用回调函数（如果设置了）
+    // 调用回调函数（如果设置了），只有此时才需要组装完整帧
     if (echoCallback) {
+        byte frame[1 + 1 + 1 + 256 + 2 + 1]; // 最大帧大小
+        int frameIndex = 0;
+        frame[frameIndex++] = FRAME_HEADER;
+        frame[frameIndex++] = originalLength;
+        frame[frameIndex++] = dataType;
+        memcpy(&frame[frameIndex], dataBuffer, payloadLength);
+        frameIndex += payloadLength;
+        frame[frameIndex++] = highByte(txCrc);
+        frame[frameIndex++] = lowByte(txCrc);
+        frame[frameIndex++] = FRAME_FOOTER;
         echoCallback(frame, frameIndex);
     }
 }
 
+void PyArduTalk::beginFrame(byte type, size_t payloadLength) {
+    Serial_sw.write(FRAME_HEADER);
+    Serial_sw.write((byte)(1 + payloadLength)); // 类型 + 数据
+    Serial_sw.write(type);
+    txCrc = PyArduTalkCRC::update(PyArduTalkCRC::CRC16_INIT, type);
+}
+
+void PyArduTalk::writePayload(const byte *data, size_t length) {
+    Serial_sw.write(data, length);
+    txCrc = PyArduTalkCRC::calculate(data, length, txCrc);
+}
+
+void PyArduTalk::endFrame() {
+    Serial_sw.write(highByte(txCrc));
+    Serial_sw.write(lowByte(txCrc));
+    Serial_sw.write(FRAME_FOOTER);
+}
+
+void PyArduTalk::writeFrame(byte type, const byte *payload, size_t length) {
+    if (length > MAX_PAYLOAD_LENGTH) {
+        length = MAX_PAYLOAD_LENGTH; // 长度字节只有 8 位，超出部分截断
+    }
+    beginFrame(type, length);
+    writePayload(payload, length);
+    endFrame();
+}
+
 void PyArduTalk::sendInt(int16_t value) {
     byte intBytes[2];
     intBytes[0] = (value >> 8) & 0xFF;
     intBytes[1] = value & 0xFF;
 
-    byte length = 1 + 2; // 类型 + 数据
-    byte frame[1 + 1 + 1 + 2 + 2 + 1];
-    int idx = 0;
-    frame[idx++] = FRAME_HEADER;
-    frame[idx++] = length;
-    frame[idx++] = TYPE_INT;
-    memcpy(&frame[idx], intBytes, 2);
-    idx += 2;
-
-    byte crc_input_int[3] = {TYPE_INT, intBytes[0], intBytes[1]};
-    uint16_t crc = calculateCRC16(crc_input_int, 3);
-    frame[idx++] = highByte(crc);
-    frame[idx++] = lowByte(crc);
-
-    frame[idx++] = FRAME_FOOTER;
-
-    Serial_sw.write(frame, idx);
+    writeFrame(TYPE_INT, intBytes, sizeof(intBytes));
 }
 
 void PyArduTalk::sendFloat(float value) {
     byte floatBytes_bigEndian[4];
     floatToBigEndian(value, floatBytes_bigEndian);
-    byte length = 1 + 4; // 类型 + 数据
-    byte frame[1 + 1 + 1 + 4 + 2 + 1];
-    int idx = 0;
-    frame[idx++] = FRAME_HEADER;
-    frame[idx++] = length;
-    frame[idx++] = TYPE_FLOAT;
-    memcpy(&frame[idx], floatBytes_bigEndian, 4);
-    idx += 4;
-
-    byte crc_input_float[5] = {TYPE_FLOAT, floatBytes_bigEndian[0], floatBytes_bigEndian[1], floatBytes_bigEndian[2], floatBytes_bigEndian[3]};
-    uint16_t crc = calculateCRC16(crc_input_float, 5);
-    frame[idx++] = highByte(crc);
-    frame[idx++] = lowByte(crc);
-
-    frame[idx++] = FRAME_FOOTER;
-
-    Serial_sw.write(frame, idx);
+
+    writeFrame(TYPE_FLOAT, floatBytes_bigEndian, sizeof(floatBytes_bigEndian));
 }
 
 void PyArduTalk::sendString(const String& value) {
-    byte strBytes[256];
-    int strLength = value.length();
-    value.getBytes(strBytes, sizeof(strBytes), 0);
-
-    byte length = 1 + strLength; // 类型 + 数据
-    byte frame[1 + 1 + 1 + 256 + 2 + 1];
-    int idx = 0;
-    frame[idx++] = FRAME_HEADER;
-    frame[idx++] = length;
-    frame[idx++] = TYPE_STRING;
-    memcpy(&frame[idx], strBytes, strLength);
-    idx += strLength;
-
-    byte crc_input_str[1 + 256];
-    crc_input_str[0] = TYPE_STRING;
-    memcpy(&crc_input_str[1], strBytes, strLength);
-    uint16_t crc_str = calculateCRC16(crc_input_str, 1 + strLength);
-    frame[idx++] = highByte(crc_str);
-    frame[idx++] = lowByte(crc_str);
-
-    frame[idx++] = FRAME_FOOTER;
-
-    Serial_sw.write(frame, idx);
+    // 直接使用 String 内部缓冲区，不再拷贝
+    writeFrame(TYPE_STRING, (const byte*)value.c_str(), value.length());
 }
 
 void PyArduTalk::sendJson(const StaticJsonDocument<256>& doc) {
     String jsonStr;
     serializeJson(doc, jsonStr);
 
-    byte jsonBytes[256];
-    int jsonLength = jsonStr.length();
-    jsonStr.getBytes(jsonBytes, sizeof(jsonBytes), 0);
-
-    byte jsonDataType = TYPE_JSON;
-    byte jsonDataLength = 1 + jsonLength; // 类型 + 数据
-    byte jsonFrame[1 + 1 + 1 + 256 + 2 + 1];
-    int jsonIdx = 0;
-    jsonFrame[jsonIdx++] = FRAME_HEADER;
-    jsonFrame[jsonIdx++] = jsonDataLength;
-    jsonFrame[jsonIdx++] = jsonDataType;
-    memcpy(&jsonFrame[jsonIdx], jsonBytes, jsonLength);
-    jsonIdx += jsonLength;
-
-    // 计算 CRC
-    byte crc_input_json[1 + 256];
-    crc_input_json[0] = jsonDataType;
-    memcpy(&crc_input_json[1], jsonBytes, jsonLength);
-    uint16_t crc_json = calculateCRC16(crc_input_json, 1 + jsonLength);
-    jsonFrame[jsonIdx++] = highByte(crc_json);
-    jsonFrame[jsonIdx++] = lowByte(crc_json);
-
-    // 帧尾
-    jsonFrame[jsonIdx++] = FRAME_FOOTER;
-
-    // 发送帧
-    Serial_sw.write(jsonFrame, jsonIdx);
+    writeFrame(TYPE_JSON, (const byte*)jsonStr.c_str(), jsonStr.length());
 }
 
 void PyArduTalk::floatToBigEndian(float value, byte *buffer) {
@@ -4,6 +4,7 @@
 #include <Arduino.h>
 #include <HardwareSerial.h>
 #include <ArduinoJson.h>
+#include "PyArduTalkCRC.h"
 
 class PyArduTalk {
 public:
@@ -77,11 +78,10 @@ private:
     byte originalLength;
     byte dataType;
     byte dataBuffer[256];
-    byte crcBuffer[256 + 1];
-    int crcIndex;
     int dataIndex;
     uint16_t crcReceived;
-    uint16_t crcCalculated;
+    uint16_t crcCalculated;   // 接收时逐字节增量更新
+    uint16_t txCrc;           // 发送时逐字节增量更新
 
     RequestCallback requestCallback;
 
@@ -105,6 +105,13 @@ private:
     void floatToBigEndian(float value, byte *buffer);
     float bigEndianToFloat(byte *buffer);
 
+    // 流式发送帧：帧头/长度/类型、数据、CRC/帧尾依次直接写入串口，不做中间拷贝
+    static const size_t MAX_PAYLOAD_LENGTH = 254; // 长度字节 = 类型(1) + 数据，最大 255
+    void beginFrame(byte type, size_t payloadLength);
+    void writePayload(const byte *data, size_t length);
+    void endFrame();
+    void writeFrame(byte type, const byte *payload, size_t length);
+
     // 超时处理变量
     unsigned long lastStateChangeTime;
     const unsigned long FRAME_TIMEOUT = 500; // 500毫秒超时
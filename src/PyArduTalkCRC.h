@@ -0,0 +1,32 @@
+#ifndef PYARDUTALK_CRC_H
+#define PYARDUTALK_CRC_H
+
+#include <stdint.h>
+#include <stddef.h>
+
+#ifdef ARDUINO
+#include <Arduino.h>
+#else
+// 主机编译（测试用）：没有 PROGMEM，直接读取内存
+#define PROGMEM
+#define pgm_read_word(addr) (*(const uint16_t*)(addr))
+#endif
+
+// CRC16-CCITT (多项式 0x1021，初值 0xFFFF)，与 serial_comm.py 保持一致
+namespace PyArduTalkCRC {
+
+    const uint16_t CRC16_INIT = 0xFFFF;
+
+    // 查找表存放在 Flash 中（AVR 上节省 512 字节 RAM）
+    extern const uint16_t CRC16_TABLE[256] PROGMEM;
+
+    // 增量更新：每收到/发送一个字节调用一次
+    inline uint16_t update(uint16_t crc, uint8_t value) {
+        return (uint16_t)(crc << 8) ^ pgm_read_word(&CRC16_TABLE[((crc >> 8) ^ value) & 0xFF]);
+    }
+
+    // 对一段数据计算（或继续计算）CRC
+    uint16_t calculate(const uint8_t* data, size_t length, uint16_t crc = CRC16_INIT);
+}
+
+#endif